@@ -3,30 +3,38 @@
 Includes login, token refresh, and registration endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.core.database import get_db
+from app.core.database import get_db, get_session_factory
 from app.schemas.auth import LoginRequest, RefreshRequest, Token
 from app.schemas.user import UserCreate, UserResponse
-from app.services.auth_service import AuthService
-from app.services.user_service import UserService
+from app.services.auth_service import auth_service
+from app.services.user_service import user_service
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=Token, summary="Login and get JWT tokens")
 async def login(
-    login_data: LoginRequest, db: AsyncSession = Depends(get_db)
+    login_data: LoginRequest,
+    background_tasks: BackgroundTasks,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):  # noqa: B008
     """Authenticate user and return JWT tokens."""
-    auth_service = AuthService(db)
-    token = await auth_service.authenticate_user(login_data.email, login_data.password)
-    if not token:
+    # The session is closed before the response, so the background write
+    # below never holds a second connection alongside this one
+    async with session_factory() as db:
+        user = await user_service.authenticate_user(
+            db, login_data.email, login_data.password
+        )
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
-    return token
+    # Written after the response is sent
+    background_tasks.add_task(user_service.record_login, session_factory, user.user_id)
+    return auth_service.create_tokens(user)
 
 
 @router.post("/refresh", response_model=Token, summary="Refresh JWT tokens")
@@ -34,8 +42,7 @@ async def refresh_token(
     refresh_data: RefreshRequest, db: AsyncSession = Depends(get_db)
 ):  # noqa: B008
     """Refresh JWT tokens using a valid refresh token."""
-    auth_service = AuthService(db)
-    token = await auth_service.refresh_tokens(refresh_data.refresh_token)
+    token = await auth_service.refresh_tokens(db, refresh_data.refresh_token)
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,9 +56,8 @@ async def register(
     user_data: UserCreate, db: AsyncSession = Depends(get_db)
 ):  # noqa: B008
     """Register a new user account."""
-    user_service = UserService(db)
     try:
-        user = await user_service.create_user(user_data)
+        user = await user_service.create_user(db, user_data)
         return user_service.to_response(user)
     except ValueError as e:
         raise HTTPException(
@@ -1,11 +1,15 @@
 """Healthcheck endpoint for the VibeStack API."""
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 
 router = APIRouter()
 
+# Serialized once; the health payload never changes
+HEALTH_BYTES = orjson.dumps({"status": "healthy"})
+
 
 @router.get("/health", summary="Health check endpoint")
 async def health_check():
     """Return health status for the API."""
-    return {"status": "healthy"}
+    return Response(content=HEALTH_BYTES, media_type="application/json")
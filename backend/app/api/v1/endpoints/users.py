@@ -1,64 +1,115 @@
 """User endpoints for the VibeStack API.
 
 Includes CRUD operations, profile, and RBAC/multi-tenant placeholders.
+Each handler opens a database session only around its queries and releases
+it before the response is built.
 """
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.core.database import get_db
-from app.schemas.user import UserResponse, UserUpdate
-from app.services.auth_service import AuthService
-from app.services.user_service import UserService
+from app.core.database import get_session_factory
+from app.schemas.user import UserListResponse, UserResponse, UserUpdate
+from app.services.auth_service import auth_service
+from app.services.user_service import user_service
 
 router = APIRouter()
 
-# OAuth2 scheme for extracting JWT from Authorization header
+# OAuth2 scheme, only used to document bearer auth in the OpenAPI schema;
+# get_current_user reads the Authorization header itself
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Serializers built once at import. Handlers return ORJSONResponse so the
+# per-request response_model validation is skipped; response_model is kept
+# for the OpenAPI schema only.
+USER_ADAPTER = TypeAdapter(UserResponse)
+USERS_ADAPTER = TypeAdapter(List[UserResponse])
+
+
+def _bearer_token(request: Request) -> str:
+    """Extract the bearer token from the Authorization header."""
+    authorization = request.headers.get("authorization")
+    if not authorization or authorization[:7].lower() != "bearer ":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return authorization[7:]
+
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+    request: Request,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):  # noqa: B008
-    """Dependency to get the current user from JWT token."""
-    auth_service = AuthService(db)
-    user_data = await auth_service.get_current_user(token)
-    if not user_data:
+    """Dependency to get the current user's profile from JWT token."""
+    token = _bearer_token(request)
+    async with session_factory() as db:
+        profile = await auth_service.get_current_user(db, token)
+    if not profile:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token"
         )
-    return user_data
+    return profile
+
+
+def get_current_superuser(
+    current_user: UserResponse = Depends(get_current_user),
+) -> UserResponse:  # noqa: B008
+    """Dependency to require an active superuser for admin routes.
+
+    Rights are read from the (cached) profile rather than the token claims,
+    so a deactivated or demoted admin is refused before the token expires.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return current_user
 
 
 @router.get("/me", response_model=UserResponse, summary="Get current user profile")
 async def read_current_user(
-    current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    current_user: UserResponse = Depends(get_current_user),
 ):  # noqa: B008
     """Get the profile of the current authenticated user."""
-    user_service = UserService(db)
-    user = await user_service.get_user_by_id(current_user.user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user_service.to_response(user)
+    # The dependency already loaded the profile
+    return ORJSONResponse(USER_ADAPTER.dump_python(current_user, mode="json"))
 
 
-@router.get("/", response_model=List[UserResponse], summary="List users (admin only)")
+@router.get("/", response_model=UserListResponse, summary="List users (admin only)")
 async def list_users(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, le=1000),
-    current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[int] = Query(
+        None, ge=0, description="Return users with an ID greater than this cursor"
+    ),
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(
+        None, deprecated=True, description="Removed; rejected in favour of cursor"
+    ),
+    current_user: UserResponse = Depends(get_current_superuser),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):  # noqa: B008
-    """List all users (admin only)."""
-    # RBAC placeholder: only allow superuser or admin
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    user_service = UserService(db)
-    users = await user_service.get_users(skip=skip, limit=limit, active_only=False)
-    return [user_service.to_response(u) for u in users]
+    """List all users (admin only), paginated by user ID."""
+    # Fail loudly rather than silently serving page one to offset clients
+    if skip is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The skip parameter is no longer supported; use cursor",
+        )
+    async with session_factory() as db:
+        users, next_cursor = await user_service.get_users(
+            db, after_id=cursor or 0, limit=limit, active_only=False
+        )
+    items = [user_service.to_response(u) for u in users]
+    return ORJSONResponse(
+        {
+            "items": USERS_ADAPTER.dump_python(items, mode="json"),
+            "next_cursor": next_cursor,
+        }
+    )
 
 
 @router.get(
@@ -66,44 +117,47 @@ async def list_users(
 )
 async def get_user(
     user_id: int = Path(..., ge=1),
-    current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_superuser),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):  # noqa: B008
     """Get a user by ID (admin only)."""
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    user_service = UserService(db)
-    user = await user_service.get_user_by_id(user_id)
-    if not user:
+    async with session_factory() as db:
+        profile = await user_service.get_user_profile(db, user_id)
+    if not profile:
         raise HTTPException(status_code=404, detail="User not found")
-    return user_service.to_response(user)
+    return ORJSONResponse(USER_ADAPTER.dump_python(profile, mode="json"))
 
 
 @router.patch("/me", response_model=UserResponse, summary="Update current user profile")
 async def update_current_user(
     user_update: UserUpdate,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):  # noqa: B008
     """Update the profile of the current authenticated user."""
-    user_service = UserService(db)
-    user = await user_service.update_user(current_user.user_id, user_update)
+    async with session_factory() as db:
+        try:
+            user = await user_service.update_user(db, current_user.user_id, user_update)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+            ) from e
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user_service.to_response(user)
+    return ORJSONResponse(
+        USER_ADAPTER.dump_python(user_service.to_response(user), mode="json")
+    )
 
 
 @router.delete("/{user_id}", summary="Delete user (admin only)")
 async def delete_user(
     user_id: int = Path(..., ge=1),
-    current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_superuser),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):  # noqa: B008
     """Delete a user by ID (admin only)."""
-    if not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    user_service = UserService(db)
-    deleted = await user_service.delete_user(user_id)
+    async with session_factory() as db:
+        deleted = await user_service.delete_user(db, user_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="User not found")
     return {"detail": "User deleted"}
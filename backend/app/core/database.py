@@ -4,24 +4,90 @@ This module provides async database session management using SQLAlchemy
 and handles database initialization and connection pooling.
 """
 
+import time
+
 import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DisconnectionError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
 
 logger = structlog.get_logger(__name__)
 
+
+def _engine_options() -> dict:
+    """Build connection pool options for the configured database.
+
+    Returns
+    -------
+        dict: Keyword arguments for ``create_async_engine``
+    """
+    if settings.ENVIRONMENT == "testing":
+        return {"poolclass": NullPool}
+
+    # SQLite uses NullPool/StaticPool, which take no sizing options
+    backend = make_url(settings.DATABASE_URL).get_backend_name()
+    if backend == "sqlite":
+        return {}
+
+    options = {
+        # Named explicitly: the sync QueuePool cannot be used with asyncio
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": 1800,
+        # Hand out the most recently returned (warm) connection first
+        "pool_use_lifo": True,
+        "pool_pre_ping": False,
+    }
+    if settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"server_settings": {"jit": "off"}, "timeout": 10}
+    return options
+
+
 # Create async engine
+_pool_options = _engine_options()
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    poolclass=NullPool if settings.ENVIRONMENT == "testing" else None,
-    pool_pre_ping=True,
-    pool_recycle=300,
+    **_pool_options,
 )
 
+
+def _record_checkin(dbapi_connection, connection_record):
+    """Remember when a pooled connection was last returned."""
+    connection_record.info["checked_in_at"] = time.monotonic()
+
+
+def _ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+    """Ping connections that sat idle in the pool for too long.
+
+    Unlike ``pool_pre_ping``, recently used connections are handed out
+    without an extra round-trip. A failed ping raises ``DisconnectionError``
+    so the pool discards the connection and checks out a fresh one.
+    """
+    checked_in_at = connection_record.info.get("checked_in_at")
+    if checked_in_at is None:
+        return
+    if time.monotonic() - checked_in_at < settings.DB_POOL_PING_INTERVAL:
+        return
+    try:
+        engine.dialect.do_ping(dbapi_connection)
+    except Exception as e:
+        logger.warning("Discarding stale database connection", error=str(e))
+        raise DisconnectionError() from e
+
+
+if "pool_size" in _pool_options:
+    event.listen(engine.sync_engine, "checkin", _record_checkin)
+    event.listen(engine.sync_engine, "checkout", _ping_idle_connection)
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -51,12 +117,32 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def get_session_factory() -> async_sessionmaker:
+    """Dependency to get the database session factory.
+
+    Endpoints open a session from the factory only around their database
+    calls, so the connection goes back to the pool before the response is
+    serialized.
+
+    Returns
+    -------
+        async_sessionmaker: Factory producing request-independent sessions
+    """
+    return AsyncSessionLocal
+
+
 async def init_db():
-    """Initialize database tables."""
-    try:
-        # Import all models to ensure they are registered
-        from app.models import user  # noqa: F401
+    """Initialize database tables.
 
+    Models must already be imported so they are registered on
+    ``Base.metadata``. In production the schema is managed by Alembic
+    migrations and this is a no-op.
+    """
+    if settings.ENVIRONMENT == "production":
+        logger.info("Skipping create_all in production; run alembic upgrade head")
+        return
+
+    try:
         # Create all tables
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
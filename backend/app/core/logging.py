@@ -4,16 +4,29 @@ This module configures structlog for structured logging throughout
 the application with proper formatting and output handling.
 """
 
+import logging
 import sys
 
+import orjson
 import structlog
 
+from app.core.config import settings
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """Serialize a log event with orjson for the JSON renderer.
+
+    The stdlib logging handlers expect text, so the bytes are decoded.
+    """
+    return orjson.dumps(obj, default=kwargs.get("default")).decode()
+
 
 def setup_logging():
     """Configure structured logging for the application."""
+    level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
+
     # Configure structlog processors
     processors = [
-        structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
         structlog.stdlib.PositionalArgumentsFormatter(),
@@ -21,25 +34,24 @@ def setup_logging():
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps),
     ]
 
-    # Configure structlog
+    # Configure structlog; the filtering wrapper drops calls below the
+    # configured level before any processor runs
     structlog.configure(
         processors=processors,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         cache_logger_on_first_use=True,
     )
 
     # Configure standard library logging
-    import logging
-
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=logging.INFO,
+        level=level,
     )
 
 
@@ -4,19 +4,76 @@ This module provides JWT token handling, password hashing,
 and other security-related functionality.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
-
+import asyncio
+import base64
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import jwt
+import orjson
 import structlog
-from jose import JWTError, jwt
+from cachetools import TTLCache
+from jwt import ExpiredSignatureError, PyJWTError
 from passlib.context import CryptContext
 
-from app.core.config import settings
+from app.core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ALGORITHM,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    SECRET_KEY,
+    settings,
+)
 
 logger = structlog.get_logger(__name__)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context. Hashes stored at any other cost (such as the
+# passlib default of 12 used before the cost was configurable) are flagged
+# for rehashing, so stored costs converge on BCRYPT_ROUNDS as users log in.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Dedicated threads for bcrypt so hashing is capped per process and does
+# not compete with other work on the default executor
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+
+# Signing key encoded once instead of on every encode/decode
+_SIGNING_KEY = SECRET_KEY.encode()
+
+# HS256 signing state: the header segment never changes and the keyed HMAC
+# is copied per token, so neither is rebuilt on every issue
+_HS256_HEADER_SEGMENT = (
+    base64.urlsafe_b64encode(orjson.dumps({"alg": "HS256", "typ": "JWT"}))
+    .rstrip(b"=")
+    .decode()
+)
+_HS256_HMAC = hmac.new(_SIGNING_KEY, digestmod=hashlib.sha256)
+
+# Default token lifetimes in seconds; ``exp`` is encoded as a Unix timestamp
+_ACCESS_TOKEN_TTL = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TOKEN_TTL = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+# Claims every token issued here carries; decoding fails if one is missing
+_DECODE_OPTIONS = {"verify_exp": True, "require": ["exp", "sub", "type"]}
+
+# Verified token payloads, keyed by the SHA-256 digest of the raw token
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Return the cache key for a token without keeping the token itself."""
+    return hashlib.sha256(token.encode()).digest()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -48,6 +105,112 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread.
+
+    bcrypt is CPU-bound, so running it on the event loop would stall every
+    other request for the duration of the hash.
+
+    Args:
+    ----
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+
+    Returns:
+    -------
+        bool: True if password matches, False otherwise
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password in a worker thread and rehash it if outdated.
+
+    Args:
+    ----
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+
+    Returns:
+    -------
+        Tuple[bool, Optional[str]]: Whether the password matches, and a
+        replacement hash at the configured cost when the stored one uses a
+        different cost (None otherwise)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor,
+        pwd_context.verify_and_update,
+        plain_password,
+        hashed_password,
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password with bcrypt in a worker thread.
+
+    Args:
+    ----
+        password: Plain text password to hash
+
+    Returns:
+    -------
+        str: Hashed password
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Return the hash checked when no user matches, built on first use."""
+    return get_password_hash("not-a-real-password")
+
+
+async def verify_dummy_password_async(plain_password: str) -> None:
+    """Spend one bcrypt check against a throwaway hash in a worker thread.
+
+    Called when a login names an unknown email, so the response takes as
+    long as a wrong password would and timing does not reveal which emails
+    are registered.
+
+    Args:
+    ----
+        plain_password: Plain text password from the login attempt
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        _password_executor,
+        lambda: verify_password(plain_password, _dummy_password_hash()),
+    )
+
+
+def _b64url(data: bytes) -> str:
+    """Encode bytes as unpadded base64url text."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _encode_jwt(claims: dict) -> str:
+    """Sign claims as a compact JWT.
+
+    HS256 tokens are assembled directly with orjson and the cached HMAC;
+    the output is a standard JWS that PyJWT verifies. Other algorithms go
+    through ``jwt.encode``.
+    """
+    if ALGORITHM != "HS256":
+        return jwt.encode(claims, _SIGNING_KEY, algorithm=ALGORITHM)
+
+    signing_input = f"{_HS256_HEADER_SEGMENT}.{_b64url(orjson.dumps(claims))}"
+    mac = _HS256_HMAC.copy()
+    mac.update(signing_input.encode())
+    return f"{signing_input}.{_b64url(mac.digest())}"
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token.
 
@@ -62,20 +225,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """
     to_encode = data.copy()
 
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-
-    to_encode.update({"exp": expire, "type": "access"})
-
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    lifetime = expires_delta.total_seconds() if expires_delta else _ACCESS_TOKEN_TTL
+    to_encode.update({"exp": int(time.time() + lifetime), "type": "access"})
 
-    return encoded_jwt
+    return _encode_jwt(to_encode)
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -92,23 +245,22 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     """
     to_encode = data.copy()
 
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    lifetime = expires_delta.total_seconds() if expires_delta else _REFRESH_TOKEN_TTL
+    to_encode.update({"exp": int(time.time() + lifetime), "type": "refresh"})
 
-    to_encode.update({"exp": expire, "type": "refresh"})
+    return _encode_jwt(to_encode)
 
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
 
-    return encoded_jwt
+# Generous upper bound for the tokens this service issues
+_MAX_TOKEN_LENGTH = 4096
 
 
 def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
     """Verify and decode a JWT token.
 
+    Successfully decoded payloads are cached until the token expires (or for
+    at most a minute), so hot tokens skip signature verification.
+
     Args:
     ----
         token: JWT token to verify
@@ -118,24 +270,52 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
     -------
         Optional[dict]: Decoded token payload or None if invalid
     """
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+    # Reject input that cannot be a compact JWS before hashing or decoding it
+    if not token or token.count(".") != 2 or len(token) > _MAX_TOKEN_LENGTH:
+        logger.warning("JWT token verification failed", error="Malformed token")
+        return None
+
+    key = _token_cache_key(token)
+    payload = _token_cache.get(key)
+
+    if payload is not None and payload.get("exp", 0) <= time.time():
+        _token_cache.pop(key, None)
+        logger.warning("JWT token verification failed", error="Token expired")
+        return None
 
-        # Verify token type
-        if payload.get("type") != token_type:
-            logger.warning(
-                "Token type mismatch", expected=token_type, actual=payload.get("type")
+    if payload is None:
+        try:
+            payload = jwt.decode(
+                token, _SIGNING_KEY, algorithms=[ALGORITHM], options=_DECODE_OPTIONS
             )
+        except ExpiredSignatureError:
+            logger.warning("JWT token verification failed", error="Token expired")
+            return None
+        except PyJWTError as e:
+            logger.warning("JWT token verification failed", error=str(e))
             return None
 
-        return payload
+        _token_cache[key] = payload
 
-    except JWTError as e:
-        logger.warning("JWT token verification failed", error=str(e))
+    # Verify token type
+    if payload.get("type") != token_type:
+        logger.warning(
+            "Token type mismatch", expected=token_type, actual=payload.get("type")
+        )
         return None
 
+    return payload
+
+
+def invalidate_token(token: str) -> None:
+    """Drop a token from the verification cache (e.g. on logout).
+
+    Args:
+    ----
+        token: JWT token to evict
+    """
+    _token_cache.pop(_token_cache_key(token), None)
+
 
 def get_token_expiration(token: str) -> Optional[datetime]:
     """Get the expiration time of a JWT token.
@@ -146,39 +326,20 @@ def get_token_expiration(token: str) -> Optional[datetime]:
 
     Returns:
     -------
-        Optional[datetime]: Token expiration time or None if invalid
+        Optional[datetime]: Token expiration time (UTC) or None if invalid
     """
     try:
         payload = jwt.decode(
             token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
+            _SIGNING_KEY,
+            algorithms=[ALGORITHM],
             options={"verify_exp": False},
         )
-
-        exp_timestamp = payload.get("exp")
-        if exp_timestamp:
-            return datetime.fromtimestamp(exp_timestamp)
-
+    except PyJWTError:
         return None
 
-    except JWTError:
+    exp_timestamp = payload.get("exp")
+    if exp_timestamp is None:
         return None
 
-
-def is_token_expired(token: str) -> bool:
-    """Check if a JWT token is expired.
-
-    Args:
-    ----
-        token: JWT token to check
-
-    Returns:
-    -------
-        bool: True if token is expired, False otherwise
-    """
-    exp_time = get_token_expiration(token)
-    if exp_time is None:
-        return True
-
-    return datetime.utcnow() > exp_time
+    return datetime.fromtimestamp(exp_timestamp, tz=timezone.utc)
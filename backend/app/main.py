@@ -4,16 +4,26 @@ This module initializes the FastAPI application with all necessary
 middleware, routers, and configuration for the VibeStack backend.
 """
 
+import random
 import time
 from contextlib import asynccontextmanager
 
+import orjson
 import structlog
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute
 
+from app import models  # noqa: F401  (registers models before init_db)
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.users import (
+    get_current_user,
+    oauth2_scheme,
+)
 from app.core.config import settings
 from app.core.database import init_db
 from app.core.logging import setup_logging
@@ -37,14 +47,71 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down VibeStack backend application")
 
 
+# Dependencies that authenticate with the bearer token
+_BEARER_AUTH_DEPENDENCIES = (get_current_user,)
+
+
+def _depends_on(dependant, calls) -> bool:
+    """Check whether a route dependency tree includes any of the callables."""
+    return any(
+        sub.call in calls or _depends_on(sub, calls) for sub in dependant.dependencies
+    )
+
+
+def install_bearer_openapi(app: FastAPI) -> None:
+    """Document bearer auth for routes guarded by the token dependencies.
+
+    ``get_current_user`` parses the Authorization header directly instead of
+    going through ``OAuth2PasswordBearer``, so FastAPI can no longer infer
+    the security scheme. Add it to the generated schema so Swagger UI still
+    shows the lock icon.
+    """
+
+    def custom_openapi() -> dict:
+        if app.openapi_schema:
+            return app.openapi_schema
+
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes,
+        )
+        scheme_name = oauth2_scheme.scheme_name
+        schema.setdefault("components", {}).setdefault("securitySchemes", {})[
+            scheme_name
+        ] = jsonable_encoder(oauth2_scheme.model, by_alias=True, exclude_none=True)
+
+        for route in app.routes:
+            # Routes hidden with include_in_schema=False have no paths entry
+            if (
+                not isinstance(route, APIRoute)
+                or not route.include_in_schema
+                or not _depends_on(route.dependant, _BEARER_AUTH_DEPENDENCIES)
+            ):
+                continue
+            operations = schema["paths"][route.path_format]
+            for method in route.methods:
+                operations[method.lower()]["security"] = [{scheme_name: []}]
+
+        app.openapi_schema = schema
+        return schema
+
+    app.openapi = custom_openapi
+
+
 def create_application() -> FastAPI:
     """Create and configure the FastAPI application."""
+    # Production serves no docs, so the OpenAPI schema is never built there
+    show_docs = settings.ENVIRONMENT != "production"
     app = FastAPI(
         title="VibeStack API",
         description="A modular FastAPI backend for VibeStack applications",
         version="1.0.0",
-        docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
-        redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
+        openapi_url="/openapi.json" if show_docs else None,
+        docs_url="/docs" if show_docs else None,
+        redoc_url="/redoc" if show_docs else None,
+        default_response_class=ORJSONResponse,
         lifespan=lifespan,
     )
 
@@ -64,27 +131,23 @@ def create_application() -> FastAPI:
     # Add request logging middleware
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        start_time = time.time()
-
-        # Log request
-        logger.info(
-            "Incoming request",
-            method=request.method,
-            url=str(request.url),
-            client_ip=request.client.host if request.client else None,
-        )
+        # Health probes are frequent and uninteresting; never log them
+        if request.url.path == "/health":
+            return await call_next(request)
 
+        start_time = time.perf_counter()
         response = await call_next(request)
 
-        # Log response
-        process_time = time.time() - start_time
-        logger.info(
-            "Request completed",
-            method=request.method,
-            url=str(request.url),
-            status_code=response.status_code,
-            process_time=f"{process_time:.4f}s",
-        )
+        # Always log failures, sample successful requests
+        if response.status_code >= 400 or random.random() < settings.LOG_SAMPLE_RATE:
+            process_time = time.perf_counter() - start_time
+            req_logger = logger.bind(method=request.method, url=str(request.url))
+            req_logger.info(
+                "Request completed",
+                client_ip=request.client.host if request.client else None,
+                status_code=response.status_code,
+                process_time=f"{process_time:.4f}s",
+            )
 
         return response
 
@@ -105,16 +168,23 @@ def create_application() -> FastAPI:
 
     # Include API router
     app.include_router(api_router, prefix="/api/v1")
+    install_bearer_openapi(app)
 
     # Health check endpoint
-    @app.get("/health")
-    async def health_check():
-        """Health check endpoint for monitoring and load balancers."""
-        return {
+    # Health probes hit this often and the body never changes, so it is
+    # serialized once per process
+    health_body = orjson.dumps(
+        {
             "status": "healthy",
             "version": "1.0.0",
             "environment": settings.ENVIRONMENT,
         }
+    )
+
+    @app.get("/health")
+    async def health_check():
+        """Health check endpoint for monitoring and load balancers."""
+        return Response(content=health_body, media_type="application/json")
 
     # Root endpoint
     @app.get("/")
@@ -123,7 +193,7 @@ def create_application() -> FastAPI:
         return {
             "message": "Welcome to VibeStack API",
             "version": "1.0.0",
-            "docs": "/docs" if settings.ENVIRONMENT != "production" else None,
+            "docs": "/docs" if show_docs else None,
             "health": "/health",
         }
 
@@ -136,9 +206,14 @@ app = create_application()
 if __name__ == "__main__":
     import uvicorn
 
+    # Worker processes spread CPU-bound bcrypt/JWT work across cores; note
+    # that in-process caches such as verified tokens are per worker
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.WEB_CONCURRENCY if settings.ENVIRONMENT == "production" else 1,
         reload=settings.ENVIRONMENT == "development",
     )
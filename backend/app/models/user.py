@@ -4,13 +4,40 @@ This module defines the User SQLAlchemy model with proper relationships,
 validation, and methods for user management.
 """
 
-from datetime import datetime
+from functools import cached_property
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, event
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 
 from app.core.database import Base
 
+# Placeholder RBAC table: permissions granted to active users per role.
+# Roles not listed get the default set.
+_DEFAULT_PERMISSIONS = frozenset({"read"})
+_ROLE_PERMISSIONS: dict[str, frozenset[str]] = {
+    "user": _DEFAULT_PERMISSIONS,
+    "admin": frozenset({"read", "write", "delete"}),
+}
+
+# Columns included in ``to_dict``
+_DICT_FIELDS = (
+    "user_id",
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_verified",
+    "is_superuser",
+    "role",
+    "bio",
+    "avatar_url",
+    "created_at",
+    "updated_at",
+    "last_login_at",
+)
+
 
 class User(Base):
     """User model for authentication and user management.
@@ -67,7 +94,21 @@ class User(Base):
         """Return string representation of the User model."""
         return f"<User(user_id={self.user_id}, email='{self.email}', username='{self.username}')>"
 
-    @property
+    # Columns the cached name properties are derived from
+    _NAME_SOURCES = ("first_name", "last_name", "username", "email")
+
+    def _clear_cached_names(self) -> None:
+        """Drop memoized name properties so they are recomputed."""
+        self.__dict__.pop("full_name", None)
+        self.__dict__.pop("display_name", None)
+
+    @validates(*_NAME_SOURCES)
+    def _invalidate_cached_names(self, key, value):
+        """Invalidate memoized names when a source column is assigned."""
+        self._clear_cached_names()
+        return value
+
+    @cached_property
     def full_name(self) -> str:
         """Get the user's full name."""
         if self.first_name and self.last_name:
@@ -79,36 +120,22 @@ class User(Base):
         else:
             return self.email
 
-    @property
+    @cached_property
     def display_name(self) -> str:
         """Get the user's display name (username or email)."""
         return self.username or self.email
 
     def to_dict(self) -> dict:
-        """Convert user to dictionary representation."""
-        return {
-            "user_id": self.user_id,
-            "email": self.email,
-            "username": self.username,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "full_name": self.full_name,
-            "is_active": self.is_active,
-            "is_verified": self.is_verified,
-            "is_superuser": self.is_superuser,
-            "role": self.role,
-            "bio": self.bio,
-            "avatar_url": self.avatar_url,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "last_login_at": self.last_login_at.isoformat()
-            if self.last_login_at
-            else None,
-        }
-
-    def update_last_login(self):
-        """Update the last login timestamp."""
-        self.last_login_at = datetime.utcnow()
+        """Convert user to dictionary representation.
+
+        Values are read straight from the attributes without validation, so
+        transient users (no ID or timestamps yet) convert as well. Timestamps
+        stay ``datetime`` objects (or None); ``ORJSONResponse`` renders them
+        as RFC 3339 natively.
+        """
+        data = {name: getattr(self, name) for name in _DICT_FIELDS}
+        data["full_name"] = self.full_name
+        return data
 
     def has_permission(self, permission: str) -> bool:
         """Check if user has a specific permission (placeholder for RBAC).
@@ -125,11 +152,9 @@ class User(Base):
         if self.is_superuser:
             return True
 
-        # Placeholder logic - replace with actual RBAC implementation
-        if permission == "read" and self.is_active:
-            return True
-
-        return False
+        return self.is_active and permission in _ROLE_PERMISSIONS.get(
+            self.role, _DEFAULT_PERMISSIONS
+        )
 
     def is_tenant_member(self, tenant_id: str) -> bool:
         """Check if user is a member of a specific tenant (placeholder for multi-tenancy).
@@ -147,3 +172,15 @@ class User(Base):
             return True
 
         return self.tenant_id == tenant_id
+
+
+@event.listens_for(User, "refresh")
+def _clear_names_on_refresh(target, context, attrs):
+    """Clear memoized names; reloaded columns bypass validators."""
+    target._clear_cached_names()
+
+
+@event.listens_for(User, "expire")
+def _clear_names_on_expire(target, attrs):
+    """Clear memoized names; expired columns will be reloaded."""
+    target._clear_cached_names()
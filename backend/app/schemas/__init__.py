@@ -5,12 +5,13 @@ and serialization in the VibeStack API.
 """
 
 from .auth import LoginRequest, RefreshRequest, Token, TokenData
-from .user import UserCreate, UserInDB, UserResponse, UserUpdate
+from .user import UserCreate, UserInDB, UserListResponse, UserResponse, UserUpdate
 
 __all__ = [
     "UserCreate",
     "UserUpdate",
     "UserResponse",
+    "UserListResponse",
     "UserInDB",
     "Token",
     "TokenData",
@@ -4,9 +4,35 @@ This module defines Pydantic models for login, token management,
 and authentication-related requests and responses.
 """
 
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    StringConstraints,
+)
+
+
+def _lower_domain(email: str) -> str:
+    """Lowercase the domain part, as EmailStr does when users register."""
+    local, _, domain = email.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+# Syntax-only email check run inside pydantic-core. Login compares the value
+# with stored addresses, so full EmailStr validation is left to registration;
+# the whitespace and domain case are normalized the same way it stores them.
+LoginEmail = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True,
+        pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$",
+        max_length=254,
+    ),
+    AfterValidator(_lower_domain),
+]
 
 
 class Token(BaseModel):
@@ -17,17 +43,18 @@ class Token(BaseModel):
     token_type: str = "bearer"
     expires_in: int  # seconds
 
-    class Config:
-        """Pydantic config for Token schema."""
-
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
                 "refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
                 "token_type": "bearer",
                 "expires_in": 3600,
             }
-        }
+        },
+    )
 
 
 class TokenData(BaseModel):
@@ -39,19 +66,23 @@ class TokenData(BaseModel):
     is_superuser: bool = False
     role: str = "user"
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
 
 class LoginRequest(BaseModel):
     """Schema for login request."""
 
-    email: EmailStr
-    password: str
-
-    class Config:
-        """Pydantic config for LoginRequest schema."""
+    email: LoginEmail
+    # Empty passwords are rejected before any bcrypt work
+    password: Annotated[str, StringConstraints(min_length=1)]
 
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {"email": "user@example.com", "password": "SecurePassword123!"}
-        }
+        },
+    )
 
 
 class RefreshRequest(BaseModel):
@@ -59,12 +90,13 @@ class RefreshRequest(BaseModel):
 
     refresh_token: str
 
-    class Config:
-        """Pydantic config for RefreshRequest schema."""
-
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {"refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."}
-        }
+        },
+    )
 
 
 class PasswordChangeRequest(BaseModel):
@@ -73,15 +105,16 @@ class PasswordChangeRequest(BaseModel):
     current_password: str
     new_password: str
 
-    class Config:
-        """Pydantic config for PasswordChangeRequest schema."""
-
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "current_password": "OldPassword123!",
                 "new_password": "NewSecurePassword456!",
             }
-        }
+        },
+    )
 
 
 class PasswordResetRequest(BaseModel):
@@ -89,10 +122,11 @@ class PasswordResetRequest(BaseModel):
 
     email: EmailStr
 
-    class Config:
-        """Pydantic config for PasswordResetRequest schema."""
-
-        json_schema_extra = {"example": {"email": "user@example.com"}}
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={"example": {"email": "user@example.com"}},
+    )
 
 
 class PasswordResetConfirm(BaseModel):
@@ -101,12 +135,13 @@ class PasswordResetConfirm(BaseModel):
     token: str
     new_password: str
 
-    class Config:
-        """Pydantic config for PasswordResetConfirm schema."""
-
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "token": "reset-token-here",
                 "new_password": "NewSecurePassword456!",
             }
-        }
+        },
+    )
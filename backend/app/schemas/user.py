@@ -4,54 +4,69 @@ This module defines Pydantic models for user creation, updates,
 and responses with proper validation and serialization.
 """
 
+import re
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    field_validator,
+)
 
+# Letters, digits, underscores and hyphens, 3 to 50 characters
+_USERNAME_RE = re.compile(r"^[\w-]{3,50}\Z")
 
-class UserBase(BaseModel):
-    """Base user schema with common fields."""
 
-    email: EmailStr
-    username: Optional[str] = None
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
-    bio: Optional[str] = None
-    avatar_url: Optional[str] = None
+def _check_username(v: Optional[str]) -> Optional[str]:
+    """Validate a username with one regex match.
 
-    @validator("username")
-    def validate_username(cls, v):
-        """Validate username format."""
-        if v is not None:
-            if len(v) < 3:
-                raise ValueError("Username must be at least 3 characters long")
-            if len(v) > 50:
-                raise ValueError("Username must be at most 50 characters long")
-            if not v.replace("_", "").replace("-", "").isalnum():
-                raise ValueError(
-                    "Username can only contain letters, numbers, underscores, and hyphens"
-                )
+    The length checks only run when the match fails, to pick the error.
+    """
+    if v is None or _USERNAME_RE.match(v):
         return v
+    if len(v) < 3:
+        raise ValueError("Username must be at least 3 characters long")
+    if len(v) > 50:
+        raise ValueError("Username must be at most 50 characters long")
+    raise ValueError(
+        "Username can only contain letters, numbers, underscores, and hyphens"
+    )
 
-    @validator("first_name", "last_name")
-    def validate_name(cls, v):
-        """Validate name fields."""
-        if v is not None and len(v) > 100:
-            raise ValueError("Name must be at most 100 characters long")
-        return v
 
-    @validator("bio")
-    def validate_bio(cls, v):
-        """Validate bio field."""
-        if v is not None and len(v) > 1000:
-            raise ValueError("Bio must be at most 1000 characters long")
-        return v
+def _check_name(v: Optional[str]) -> Optional[str]:
+    """Validate a first or last name."""
+    if v is not None and len(v) > 100:
+        raise ValueError("Name must be at most 100 characters long")
+    return v
+
+
+def _check_bio(v: Optional[str]) -> Optional[str]:
+    """Validate a profile bio."""
+    if v is not None and len(v) > 1000:
+        raise ValueError("Bio must be at most 1000 characters long")
+    return v
+
+
+# Profile field types shared by the create, update and response schemas
+Username = Annotated[Optional[str], AfterValidator(_check_username)]
+Name = Annotated[Optional[str], AfterValidator(_check_name)]
+Bio = Annotated[Optional[str], AfterValidator(_check_bio)]
+
+
+class UserBase(BaseModel):
+    """Base user schema with common fields."""
 
-    class Config:
-        """Pydantic config for UserBase schema."""
+    email: EmailStr
+    username: Username = None
+    first_name: Name = None
+    last_name: Name = None
+    bio: Bio = None
+    avatar_url: Optional[str] = None
 
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserCreate(UserBase):
@@ -60,70 +75,60 @@ class UserCreate(UserBase):
     password: str
     is_superuser: Optional[bool] = False
 
-    @validator("password")
+    @field_validator("password")
+    @classmethod
     def validate_password(cls, v):
         """Validate password strength."""
         if len(v) < 8:
             raise ValueError("Password must be at least 8 characters long")
-        if not any(c.isupper() for c in v):
+
+        # Single pass over the characters, stopping once all classes are seen
+        has_upper = has_lower = has_digit = False
+        for c in v:
+            if c.isupper():
+                has_upper = True
+            elif c.islower():
+                has_lower = True
+            elif c.isdigit():
+                has_digit = True
+            if has_upper and has_lower and has_digit:
+                return v
+
+        if not has_upper:
             raise ValueError("Password must contain at least one uppercase letter")
-        if not any(c.islower() for c in v):
+        if not has_lower:
             raise ValueError("Password must contain at least one lowercase letter")
-        if not any(c.isdigit() for c in v):
-            raise ValueError("Password must contain at least one digit")
-        return v
+        raise ValueError("Password must contain at least one digit")
 
-    class Config:
-        """Pydantic config for UserCreate schema."""
-
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserUpdate(BaseModel):
     """Schema for updating user information."""
 
     email: Optional[EmailStr] = None
-    username: Optional[str] = None
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
-    bio: Optional[str] = None
+    username: Username = None
+    first_name: Name = None
+    last_name: Name = None
+    bio: Bio = None
     avatar_url: Optional[str] = None
     is_active: Optional[bool] = None
     is_verified: Optional[bool] = None
 
-    @validator("username")
-    def validate_username(cls, v):
-        """Validate username format."""
-        if v is not None:
-            if len(v) < 3:
-                raise ValueError("Username must be at least 3 characters long")
-            if len(v) > 50:
-                raise ValueError("Username must be at most 50 characters long")
-            if not v.replace("_", "").replace("-", "").isalnum():
-                raise ValueError(
-                    "Username can only contain letters, numbers, underscores, and hyphens"
-                )
-        return v
+    model_config = ConfigDict(from_attributes=True)
 
-    @validator("first_name", "last_name")
-    def validate_name(cls, v):
-        """Validate name fields."""
-        if v is not None and len(v) > 100:
-            raise ValueError("Name must be at most 100 characters long")
-        return v
+    @field_validator("email", "is_active", "is_verified")
+    @classmethod
+    def reject_null(cls, v, info):
+        """Reject an explicit null for columns that cannot be empty.
 
-    @validator("bio")
-    def validate_bio(cls, v):
-        """Validate bio field."""
-        if v is not None and len(v) > 1000:
-            raise ValueError("Bio must be at most 1000 characters long")
+        Omitted fields keep their default and are not validated, so this
+        only fires when the client sends ``null``.
+        """
+        if v is None:
+            raise ValueError(f"{info.field_name} cannot be null")
         return v
 
-    class Config:
-        """Pydantic config for UserUpdate schema."""
-
-        from_attributes = True
-
 
 class UserInDB(UserBase):
     """Schema for user data in database (includes internal fields)."""
@@ -139,10 +144,7 @@ class UserInDB(UserBase):
     updated_at: datetime
     last_login_at: Optional[datetime] = None
 
-    class Config:
-        """Pydantic config for UserInDB schema."""
-
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserResponse(UserBase):
@@ -174,11 +176,9 @@ class UserResponse(UserBase):
         """Get the user's display name."""
         return self.username or self.email
 
-    class Config:
-        """Pydantic config for UserResponse schema."""
-
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "user_id": 1,
                 "email": "user@example.com",
@@ -197,4 +197,12 @@ class UserResponse(UserBase):
                 "updated_at": "2023-01-01T00:00:00Z",
                 "last_login_at": "2023-01-01T12:00:00Z",
             }
-        }
+        },
+    )
+
+
+class UserListResponse(BaseModel):
+    """Schema for a page of users with a keyset pagination cursor."""
+
+    items: List[UserResponse]
+    next_cursor: Optional[int] = None
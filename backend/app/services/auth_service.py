@@ -9,53 +9,87 @@ from typing import Optional
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES
 from app.core.security import (
     create_access_token,
     create_refresh_token,
-    is_token_expired,
+    invalidate_token,
     verify_token,
 )
 from app.schemas.auth import Token, TokenData
-from app.services.user_service import UserService
+from app.schemas.user import UserResponse
+from app.services.user_service import user_service
 
 logger = structlog.get_logger(__name__)
 
 
+def _build_token_claims(user) -> dict:
+    """Build the JWT claims for a user.
+
+    Accepts any object with the user's fields: a ``User`` row, a cached
+    ``UserResponse`` profile or ``TokenData``.
+    """
+    return {
+        "sub": str(user.user_id),
+        "email": user.email,
+        "username": user.username,
+        "is_superuser": user.is_superuser,
+        "role": user.role,
+    }
+
+
+def _issue_tokens(claims: dict) -> Token:
+    """Sign an access/refresh token pair for the given claims."""
+    return Token(
+        access_token=create_access_token(data=claims),
+        refresh_token=create_refresh_token(data=claims),
+        token_type="bearer",
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
 class AuthService:
-    """Service class for authentication-related operations."""
+    """Service class for authentication-related operations.
 
-    def __init__(self, db: AsyncSession):
-        """Initialize AuthService with a database session."""
-        self.db = db
-        self.user_service = UserService(db)
+    The service holds no per-request state; methods that hit the database
+    take the session to use as their first argument.
+    """
 
-    async def authenticate_user(self, email: str, password: str) -> Optional[Token]:
+    async def authenticate_user(
+        self, db: AsyncSession, email: str, password: str
+    ) -> Optional[Token]:
         """Authenticate user and return JWT tokens.
 
         Args:
         ----
+            db: Database session
             email: User email
             password: Plain text password
 
         Returns:
         -------
-            Optional[Token]: JWT tokens if authentication successful, None otherwise
+            Optional[Token]: JWT tokens if authentication successful, None otherwise.
+            The last login time is not recorded; see
+            ``UserService.record_login``.
         """
-        user = await self.user_service.authenticate_user(email, password)
+        user = await user_service.authenticate_user(db, email, password)
         if not user:
             return None
 
-        # Create tokens
-        token_data = {
-            "sub": str(user.user_id),
-            "email": user.email,
-            "username": user.username,
-            "is_superuser": user.is_superuser,
-            "role": user.role,
-        }
+        return self.create_tokens(user)
+
+    def create_tokens(self, user) -> Token:
+        """Issue tokens for a user who has just been authenticated.
+
+        Args:
+        ----
+            user: Authenticated user (any object with the claim fields)
 
-        access_token = create_access_token(data=token_data)
-        refresh_token = create_refresh_token(data=token_data)
+        Returns:
+        -------
+            Token: JWT tokens
+        """
+        tokens = _issue_tokens(_build_token_claims(user))
 
         logger.info(
             "User authenticated and tokens created",
@@ -63,102 +97,102 @@ class AuthService:
             email=user.email,
         )
 
-        return Token(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-            expires_in=60 * 60,  # 1 hour in seconds
-        )
+        return tokens
 
-    async def refresh_tokens(self, refresh_token: str) -> Optional[Token]:
+    async def refresh_tokens(
+        self, db: AsyncSession, refresh_token: str
+    ) -> Optional[Token]:
         """Refresh access token using refresh token.
 
         Args:
         ----
+            db: Database session
             refresh_token: Valid refresh token
 
         Returns:
         -------
             Optional[Token]: New JWT tokens if refresh successful, None otherwise
         """
-        # Verify refresh token
+        # Verify refresh token (signature and expiry in one decode)
         payload = verify_token(refresh_token, token_type="refresh")
         if not payload:
             logger.warning("Invalid refresh token provided")
             return None
 
-        # Check if token is expired
-        if is_token_expired(refresh_token):
-            logger.warning("Refresh token is expired")
-            return None
-
-        # Get user from database
+        # Load the (cached) profile to ensure the user is still active
         user_id = int(payload.get("sub"))
-        user = await self.user_service.get_user_by_id(user_id)
+        user = await user_service.get_user_profile(db, user_id)
 
         if not user or not user.is_active:
             logger.warning("User not found or inactive", user_id=user_id)
             return None
 
-        # Create new tokens
-        token_data = {
-            "sub": str(user.user_id),
-            "email": user.email,
-            "username": user.username,
-            "is_superuser": user.is_superuser,
-            "role": user.role,
-        }
-
-        access_token = create_access_token(data=token_data)
-        new_refresh_token = create_refresh_token(data=token_data)
+        tokens = _issue_tokens(_build_token_claims(user))
 
         logger.info(
             "Tokens refreshed successfully", user_id=user.user_id, email=user.email
         )
 
-        return Token(
-            access_token=access_token,
-            refresh_token=new_refresh_token,
-            token_type="bearer",
-            expires_in=60 * 60,  # 1 hour in seconds
-        )
+        return tokens
 
-    async def get_current_user(self, token: str) -> Optional[TokenData]:
-        """Get current user from access token.
+    async def get_current_user(
+        self, db: AsyncSession, token: str
+    ) -> Optional[UserResponse]:
+        """Get the current user's profile from an access token.
+
+        The profile doubles as the existence and active check, so callers
+        that need the user's data get it without a second lookup.
 
         Args:
         ----
+            db: Database session
             token: JWT access token
 
         Returns:
         -------
-            Optional[TokenData]: User data from token or None if invalid
+            Optional[UserResponse]: User profile or None if invalid
         """
-        # Verify access token
+        # Verify access token (signature and expiry in one decode)
         payload = verify_token(token, token_type="access")
         if not payload:
             logger.warning("Invalid access token provided")
             return None
 
-        # Check if token is expired
-        if is_token_expired(token):
-            logger.warning("Access token is expired")
-            return None
-
-        # Get user from database to ensure they still exist and are active
+        # Load the profile to ensure the user still exists and is active
         user_id = int(payload.get("sub"))
-        user = await self.user_service.get_user_by_id(user_id)
+        profile = await user_service.get_user_profile(db, user_id)
 
-        if not user or not user.is_active:
+        if not profile or not profile.is_active:
             logger.warning("User not found or inactive", user_id=user_id)
             return None
 
+        return profile
+
+    def get_token_data(self, token: str) -> Optional[TokenData]:
+        """Get the user claims embedded in an access token.
+
+        Decodes the token only, without checking the database. Claims such
+        as ``is_superuser`` reflect the user at login time.
+
+        Args:
+        ----
+            token: JWT access token
+
+        Returns:
+        -------
+            Optional[TokenData]: User data from token or None if invalid
+        """
+        payload = verify_token(token, token_type="access")
+        if not payload:
+            logger.warning("Invalid access token provided")
+            return None
+
         return TokenData(
-            user_id=user.user_id,
-            email=user.email,
-            username=user.username,
-            is_superuser=user.is_superuser,
-            role=user.role,
+            user_id=int(payload["sub"]),
+            email=payload.get("email"),
+            username=payload.get("username"),
+            is_superuser=payload.get("is_superuser", False),
+            role=payload.get("role", "user"),
         )
 
     async def revoke_token(self, token: str) -> bool:
@@ -173,15 +207,33 @@ class AuthService:
             bool: True if token was revoked (placeholder implementation)
         """
         # TODO: Implement token blacklisting with Redis or database
-        # For now, this is a placeholder that always returns True
+        # For now, this only evicts the token from the verification cache
+        invalidate_token(token)
         logger.info("Token revocation requested (placeholder implementation)")
         return True
 
-    async def validate_token(self, token: str) -> bool:
-        """Validate if a token is still valid.
+    def is_token_valid_fast(self, token: str) -> bool:
+        """Check an access token's signature and expiry without the database.
+
+        Suitable for "is this client logged in" gates. Use
+        ``validate_token`` when the user must also still be active.
 
         Args:
         ----
+            token: JWT access token
+
+        Returns:
+        -------
+            bool: True if the token is validly signed and unexpired
+        """
+        return verify_token(token) is not None
+
+    async def validate_token(self, db: AsyncSession, token: str) -> bool:
+        """Validate if a token is still valid and its user is active.
+
+        Args:
+        ----
+            db: Database session
             token: JWT token to validate
 
         Returns:
@@ -193,15 +245,11 @@ class AuthService:
         if not payload:
             return False
 
-        # Check if token is expired
-        if is_token_expired(token):
-            return False
-
-        # Get user from database to ensure they still exist and are active
+        # Load the (cached) profile to ensure the user is still active
         user_id = int(payload.get("sub"))
-        user = await self.user_service.get_user_by_id(user_id)
+        profile = await user_service.get_user_profile(db, user_id)
 
-        if not user or not user.is_active:
+        if not profile or not profile.is_active:
             return False
 
         return True
@@ -228,20 +276,15 @@ class AuthService:
         -------
             Token: JWT tokens
         """
-        token_data = {
-            "sub": str(user_id),
-            "email": email,
-            "username": username,
-            "is_superuser": is_superuser,
-            "role": role,
-        }
-
-        access_token = create_access_token(data=token_data)
-        refresh_token = create_refresh_token(data=token_data)
-
-        return Token(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-            expires_in=60 * 60,  # 1 hour in seconds
+        user = TokenData(
+            user_id=user_id,
+            email=email,
+            username=username,
+            is_superuser=is_superuser,
+            role=role,
         )
+        return _issue_tokens(_build_token_claims(user))
+
+
+# Shared stateless service instance
+auth_service = AuthService()
@@ -4,31 +4,133 @@ This module contains the UserService class that handles all user-related
 business logic, database operations, and validation.
 """
 
-from typing import List, Optional
+import asyncio
+import re
+import weakref
+from typing import List, Optional, Tuple
 
 import structlog
-from sqlalchemy import select, update
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.security import get_password_hash, verify_password
+from cachetools import TTLCache
+from sqlalchemy import Row, bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import load_only, raiseload
+
+from app.core.security import (
+    get_password_hash_async,
+    verify_and_update_password_async,
+    verify_dummy_password_async,
+    verify_password_async,
+)
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
 
 logger = structlog.get_logger(__name__)
 
+# Short-lived cache of user profiles keyed by user ID. ORM instances are
+# bound to the session that loaded them, so only the detached response
+# schema is cached.
+_profile_cache: TTLCache = TTLCache(maxsize=50_000, ttl=30)
+
+# One lock per user ID with a profile load in flight, so concurrent misses
+# for the same user share a single SELECT; entries vanish once unused
+_profile_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+# User queries load no relationships implicitly; any future lazy access
+# fails loudly instead of issuing hidden per-row queries
+_NO_LAZY_LOADS = raiseload("*")
+
+# Columns login needs to verify credentials and build token claims. They
+# are selected as a plain row, so login never hydrates a User instance.
+_LOGIN_COLUMNS = (
+    User.user_id,
+    User.email,
+    User.hashed_password,
+    User.username,
+    User.is_active,
+    User.is_superuser,
+    User.role,
+)
+
+# Columns rendered by ``to_response``; list queries skip everything else,
+# notably the password hash.
+_RESPONSE_COLUMNS = load_only(
+    User.user_id,
+    User.email,
+    User.username,
+    User.first_name,
+    User.last_name,
+    User.bio,
+    User.avatar_url,
+    User.is_active,
+    User.is_verified,
+    User.is_superuser,
+    User.role,
+    User.created_at,
+    User.updated_at,
+    User.last_login_at,
+)
+
+# Unique indexes whose violation is reported back to the client
+_UNIQUE_CONFLICTS = {
+    "ix_users_email": "Email already registered",
+    "ix_users_username": "Username already taken",
+}
+_SQLITE_UNIQUE_RE = re.compile(r"UNIQUE constraint failed: users\.(\w+)\Z")
+
+# Hot lookups built once; a constant statement memoizes its cache key, so
+# each call goes straight to the compiled-SQL cache
+_BY_EMAIL = select(User).options(_NO_LAZY_LOADS).where(User.email == bindparam("email"))
+_BY_USERNAME = (
+    select(User).options(_NO_LAZY_LOADS).where(User.username == bindparam("username"))
+)
+_CREDENTIALS_BY_EMAIL = select(*_LOGIN_COLUMNS).where(User.email == bindparam("email"))
+
 
 class UserService:
-    """Service class for user-related operations."""
+    """Service class for user-related operations.
+
+    The service holds no per-request state; every database-bound method
+    takes the session to use as its first argument.
+    """
+
+    @staticmethod
+    def _conflict_error(exc: IntegrityError) -> Optional[ValueError]:
+        """Map a unique-constraint violation to the matching user error.
+
+        asyncpg reports the violated index (``ix_users_username``) as the
+        constraint name and SQLite names the column (``users.username``).
+        The rest of the message is not inspected, since Postgres includes
+        the duplicate value in it.
 
-    def __init__(self, db: AsyncSession):
-        """Initialize UserService with a database session."""
-        self.db = db
+        Args:
+        ----
+            exc: Error raised by the INSERT or UPDATE
 
-    async def create_user(self, user_data: UserCreate) -> User:
+        Returns:
+        -------
+            Optional[ValueError]: Error describing which field is already
+            taken, or None if the violation is not a known unique conflict
+        """
+        orig = exc.orig
+        # The asyncpg error sits behind SQLAlchemy's DBAPI adapter
+        constraint = getattr(orig, "constraint_name", None) or getattr(
+            orig.__cause__, "constraint_name", None
+        )
+        if constraint is None:
+            match = _SQLITE_UNIQUE_RE.match(str(orig))
+            constraint = match and f"ix_users_{match.group(1)}"
+        message = _UNIQUE_CONFLICTS.get(constraint)
+        return ValueError(message) if message else None
+
+    async def create_user(self, db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user.
 
         Args:
         ----
+            db: Database session
             user_data: User creation data
 
         Returns:
@@ -39,19 +141,8 @@ class UserService:
         ------
             ValueError: If email or username already exists
         """
-        # Check if email already exists
-        existing_user = await self.get_user_by_email(user_data.email)
-        if existing_user:
-            raise ValueError("Email already registered")
-
-        # Check if username already exists (if provided)
-        if user_data.username:
-            existing_user = await self.get_user_by_username(user_data.username)
-            if existing_user:
-                raise ValueError("Username already taken")
-
         # Create user instance
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         user = User(
             email=user_data.email,
             username=user_data.username,
@@ -65,186 +156,373 @@ class UserService:
             else False,
         )
 
-        # Save to database
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        # Save to database; the unique indexes on email and username reject
+        # duplicates, so no existence check is needed beforehand
+        db.add(user)
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            conflict = self._conflict_error(e)
+            if conflict is None:
+                raise
+            raise conflict from e
+        await db.refresh(user)
 
         logger.info("User created successfully", user_id=user.user_id, email=user.email)
         return user
 
-    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def bulk_create_users(self, db: AsyncSession, users: List[UserCreate]) -> int:
+        """Create several users with one INSERT and one commit.
+
+        Meant for seeding; passwords are hashed concurrently and the rows
+        skip the ORM unit of work, so no User instances are returned.
+
+        Args:
+        ----
+            db: Database session
+            users: User creation data
+
+        Returns:
+        -------
+            int: Number of users created
+
+        Raises:
+        ------
+            ValueError: If any email or username already exists, with the
+                same messages as ``create_user``. Nothing is inserted, since
+                all rows share one transaction.
+            IntegrityError: For any other constraint violation
+        """
+        if not users:
+            return 0
+
+        hashes = await asyncio.gather(
+            *(get_password_hash_async(u.password) for u in users)
+        )
+        rows = [
+            {
+                **u.model_dump(exclude={"password"}),
+                "hashed_password": hashed,
+                "is_superuser": bool(u.is_superuser),
+            }
+            for u, hashed in zip(users, hashes)
+        ]
+        try:
+            await db.execute(insert(User).values(rows))
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            conflict = self._conflict_error(e)
+            if conflict is None:
+                raise
+            raise conflict from e
+
+        logger.info("Users created in bulk", count=len(rows))
+        return len(rows)
+
+    async def get_user_by_id(self, db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID.
 
+        Checks the session's identity map first, so repeated lookups of the
+        same user within one session issue no SQL.
+
         Args:
         ----
+            db: Database session
             user_id: User ID
 
         Returns:
         -------
             Optional[User]: User instance or None if not found
         """
-        result = await self.db.execute(select(User).where(User.user_id == user_id))
-        return result.scalar_one_or_none()
+        return await db.get(User, user_id, options=[_NO_LAZY_LOADS])
+
+    async def get_user_profile(
+        self, db: AsyncSession, user_id: int
+    ) -> Optional[UserResponse]:
+        """Get a user's profile by ID, served from a short-lived cache.
+
+        Args:
+        ----
+            db: Database session
+            user_id: User ID
+
+        Returns:
+        -------
+            Optional[UserResponse]: User profile or None if not found
+        """
+        profile = _profile_cache.get(user_id)
+        if profile is not None:
+            return profile
+
+        lock = _profile_locks.get(user_id)
+        if lock is None:
+            lock = _profile_locks[user_id] = asyncio.Lock()
+        async with lock:
+            # Another request may have loaded it while this one waited
+            profile = _profile_cache.get(user_id)
+            if profile is None:
+                user = await self.get_user_by_id(db, user_id)
+                if not user:
+                    return None
+                profile = self.to_response(user)
+                _profile_cache[user_id] = profile
+        return profile
+
+    def invalidate_profile(self, user_id: int) -> None:
+        """Drop a user's cached profile after the row changes.
 
-    async def get_user_by_email(self, email: str) -> Optional[User]:
+        Args:
+        ----
+            user_id: User ID
+        """
+        _profile_cache.pop(user_id, None)
+
+    def clear_profile_cache(self) -> None:
+        """Drop every cached profile, e.g. after rows are removed in bulk."""
+        _profile_cache.clear()
+
+    async def get_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email.
 
         Args:
         ----
+            db: Database session
             email: User email
 
         Returns:
         -------
             Optional[User]: User instance or None if not found
         """
-        result = await self.db.execute(select(User).where(User.email == email))
+        result = await db.execute(_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
 
-    async def get_user_by_username(self, username: str) -> Optional[User]:
+    async def get_user_by_username(
+        self, db: AsyncSession, username: str
+    ) -> Optional[User]:
         """Get user by username.
 
         Args:
         ----
+            db: Database session
             username: Username
 
         Returns:
         -------
             Optional[User]: User instance or None if not found
         """
-        result = await self.db.execute(select(User).where(User.username == username))
+        result = await db.execute(_BY_USERNAME, {"username": username})
         return result.scalar_one_or_none()
 
     async def get_users(
-        self, skip: int = 0, limit: int = 100, active_only: bool = True
-    ) -> List[User]:
-        """Get list of users with pagination.
+        self,
+        db: AsyncSession,
+        after_id: int = 0,
+        limit: int = 100,
+        active_only: bool = True,
+    ) -> Tuple[List[User], Optional[int]]:
+        """Get a page of users using keyset (seek) pagination.
+
+        Seeking on the primary key stays an index range scan however deep
+        the page is, unlike OFFSET which scans and discards skipped rows.
 
         Args:
         ----
-            skip: Number of records to skip
+            db: Database session
+            after_id: Only return users with an ID greater than this value
             limit: Maximum number of records to return
             active_only: If True, only return active users
 
         Returns:
         -------
-            List[User]: List of user instances
+            Tuple[List[User], Optional[int]]: Users ordered by ID, and the
+            cursor for the next page (None when this page is the last)
         """
-        query = select(User)
+        query = (
+            select(User)
+            .options(_RESPONSE_COLUMNS, _NO_LAZY_LOADS)
+            .where(User.user_id > after_id)
+        )
 
         if active_only is True:
             query = query.where(User.is_active.is_(True))
 
-        query = query.offset(skip).limit(limit)
-        result = await self.db.execute(query)
+        query = query.order_by(User.user_id).limit(limit)
+        result = await db.execute(query)
+        users = result.scalars().all()
 
-        return result.scalars().all()
+        # A full page means there may be more users after the last one
+        next_cursor = users[-1].user_id if users and len(users) == limit else None
+        return users, next_cursor
 
-    async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+    async def update_user(
+        self, db: AsyncSession, user_id: int, user_data: UserUpdate
+    ) -> Optional[User]:
         """Update user information.
 
         Args:
         ----
+            db: Database session
             user_id: User ID to update
             user_data: User update data
 
         Returns:
         -------
             Optional[User]: Updated user instance or None if not found
-        """
-        # Get existing user
-        user = await self.get_user_by_id(user_id)
-        if not user:
-            return None
-
-        # Check for email conflicts
-        if user_data.email and user_data.email != user.email:
-            existing_user = await self.get_user_by_email(user_data.email)
-            if existing_user:
-                raise ValueError("Email already registered")
-
-        # Check for username conflicts
-        if user_data.username and user_data.username != user.username:
-            existing_user = await self.get_user_by_username(user_data.username)
-            if existing_user:
-                raise ValueError("Username already taken")
 
-        # Update user fields
-        update_data = user_data.dict(exclude_unset=True)
-
-        if update_data:
-            await self.db.execute(
-                update(User).where(User.user_id == user_id).values(**update_data)
+        Raises:
+        ------
+            ValueError: If the new email or username already exists
+        """
+        # An empty body sets no fields; skip the dump and the UPDATE
+        if not user_data.model_fields_set:
+            return await self.get_user_by_id(db, user_id)
+
+        update_data = user_data.model_dump(exclude_unset=True)
+
+        # UPDATE ... RETURNING hands back the updated row, so neither a
+        # lookup beforehand nor a refresh afterwards is needed. Email and
+        # username conflicts surface from the unique indexes.
+        try:
+            result = await db.execute(
+                update(User)
+                .where(User.user_id == user_id)
+                .values(**update_data)
+                .returning(User)
             )
-            await self.db.commit()
+            user = result.scalar_one_or_none()
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            conflict = self._conflict_error(e)
+            if conflict is None:
+                raise
+            raise conflict from e
 
-            # Refresh user instance
-            await self.db.refresh(user)
-
-            logger.info("User updated successfully", user_id=user_id)
+        if not user:
+            return None
 
+        self.invalidate_profile(user_id)
+        logger.info("User updated successfully", user_id=user_id)
         return user
 
-    async def delete_user(self, user_id: int) -> bool:
+    async def delete_user(self, db: AsyncSession, user_id: int) -> bool:
         """Delete a user (soft delete by setting is_active to False).
 
         Args:
         ----
+            db: Database session
             user_id: User ID to delete
 
         Returns:
         -------
             bool: True if user was deleted, False if not found
         """
-        user = await self.get_user_by_id(user_id)
+        user = await self.get_user_by_id(db, user_id)
         if not user:
             return False
 
         # Soft delete by setting is_active to False
         user.is_active = False
-        await self.db.commit()
+        await db.commit()
+        self.invalidate_profile(user_id)
 
         logger.info("User deleted successfully", user_id=user_id)
         return True
 
-    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
+    async def _get_auth_credentials(
+        self, db: AsyncSession, email: str
+    ) -> Optional[Row]:
+        """Fetch the login columns for an email without building a User."""
+        result = await db.execute(_CREDENTIALS_BY_EMAIL, {"email": email})
+        return result.one_or_none()
+
+    async def authenticate_user(
+        self, db: AsyncSession, email: str, password: str
+    ) -> Optional[Row]:
         """Authenticate user with email and password.
 
         Args:
         ----
+            db: Database session
             email: User email
             password: Plain text password
 
         Returns:
         -------
-            Optional[User]: Authenticated user or None if invalid credentials
+            Optional[Row]: Credential and claim columns of the authenticated
+            user (read as attributes, like a User), or None if invalid
+            credentials. The last login time is written separately by
+            ``record_login``.
         """
-        user = await self.get_user_by_email(email)
+        user = await self._get_auth_credentials(db, email)
         if not user:
+            # Match the cost of a wrong password so unknown emails can't be
+            # told apart by response time
+            await verify_dummy_password_async(password)
             return None
 
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password_async(
+            password, user.hashed_password
+        )
+        if not verified:
             return None
 
         if not user.is_active:
             return None
 
-        # Update last login
-        user.update_last_login()
-        await self.db.commit()
+        if new_hash:
+            # Bring hashes from an older cost in line with BCRYPT_ROUNDS, so
+            # every account costs the same to check as the unknown-email path
+            await db.execute(
+                update(User)
+                .where(User.user_id == user.user_id)
+                .values(hashed_password=new_hash)
+            )
+            await db.commit()
+            logger.info("Password rehashed at current cost", user_id=user.user_id)
 
         logger.info(
             "User authenticated successfully", user_id=user.user_id, email=user.email
         )
         return user
 
+    async def record_login(
+        self, session_factory: async_sessionmaker, user_id: int
+    ) -> None:
+        """Stamp the user's last login time in a session of its own.
+
+        Scheduled as a background task by the login route, so the write is
+        kept out of the login response time.
+
+        Args:
+        ----
+            session_factory: Factory for the session the update runs in
+            user_id: User ID that just logged in
+        """
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(User)
+                    .where(User.user_id == user_id)
+                    .values(last_login_at=func.now())
+                )
+                await db.commit()
+        except SQLAlchemyError as exc:
+            logger.warning("Failed to record login", user_id=user_id, error=str(exc))
+            return
+
+        self.invalidate_profile(user_id)
+
     async def change_password(
-        self, user_id: int, current_password: str, new_password: str
+        self, db: AsyncSession, user_id: int, current_password: str, new_password: str
     ) -> bool:
         """Change user password.
 
         Args:
         ----
+            db: Database session
             user_id: User ID
             current_password: Current password
             new_password: New password
@@ -253,45 +531,50 @@ class UserService:
         -------
             bool: True if password was changed, False if invalid current password
         """
-        user = await self.get_user_by_id(user_id)
+        user = await self.get_user_by_id(db, user_id)
         if not user:
             return False
 
         # Verify current password
-        if not verify_password(current_password, user.hashed_password):
+        if not await verify_password_async(current_password, user.hashed_password):
             return False
 
         # Hash and update new password
-        hashed_password = get_password_hash(new_password)
-        await self.db.execute(
+        hashed_password = await get_password_hash_async(new_password)
+        await db.execute(
             update(User)
             .where(User.user_id == user_id)
             .values(hashed_password=hashed_password)
         )
-        await self.db.commit()
+        await db.commit()
 
         logger.info("Password changed successfully", user_id=user_id)
         return True
 
-    async def verify_user(self, user_id: int) -> bool:
+    async def verify_user(self, db: AsyncSession, user_id: int) -> bool:
         """Mark user as verified.
 
         Args:
         ----
+            db: Database session
             user_id: User ID to verify
 
         Returns:
         -------
             bool: True if user was verified, False if not found
         """
-        user = await self.get_user_by_id(user_id)
-        if not user:
+        result = await db.execute(
+            update(User)
+            .where(User.user_id == user_id)
+            .values(is_verified=True)
+            .returning(User.user_id)
+        )
+        verified = result.scalar_one_or_none() is not None
+        await db.commit()
+        if not verified:
             return False
 
-        await self.db.execute(
-            update(User).where(User.user_id == user_id).values(is_verified=True)
-        )
-        await self.db.commit()
+        self.invalidate_profile(user_id)
 
         logger.info("User verified successfully", user_id=user_id)
         return True
@@ -299,6 +582,9 @@ class UserService:
     def to_response(self, user: User) -> UserResponse:
         """Convert User model to UserResponse schema.
 
+        Database rows are trusted, so the schema is built without running
+        validation again.
+
         Args:
         ----
             user: User model instance
@@ -307,7 +593,7 @@ class UserService:
         -------
             UserResponse: User response schema
         """
-        return UserResponse(
+        return UserResponse.model_construct(
             user_id=user.user_id,
             email=user.email,
             username=user.username,
@@ -323,3 +609,7 @@ class UserService:
             updated_at=user.updated_at,
             last_login_at=user.last_login_at,
         )
+
+
+# Shared stateless service instance
+user_service = UserService()
@@ -1,16 +1,19 @@
 """Seed data script for VibeStack backend.
 
-Creates an initial admin and test user if they do not exist.
+Creates an initial admin and test user if they do not exist. In production
+the tables must already exist (``alembic upgrade head``).
 """
 
 import asyncio
 import os
 
 import structlog
+from sqlalchemy import or_, select
 
 from app.core.database import AsyncSessionLocal, init_db
+from app.models.user import User
 from app.schemas.user import UserCreate
-from app.services.user_service import UserService
+from app.services.user_service import user_service
 
 logger = structlog.get_logger(__name__)
 
@@ -19,40 +22,59 @@ ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "Admin1234!")
 TEST_EMAIL = os.getenv("TEST_EMAIL", "test@vibestack.dev")
 TEST_PASSWORD = os.getenv("TEST_PASSWORD", "Test1234!")
 
+SEED_USERS = [
+    {
+        "email": ADMIN_EMAIL,
+        "password": ADMIN_PASSWORD,
+        "username": "admin",
+        "first_name": "Admin",
+        "last_name": "User",
+    },
+    {
+        "email": TEST_EMAIL,
+        "password": TEST_PASSWORD,
+        "username": "testuser",
+        "first_name": "Test",
+        "last_name": "User",
+    },
+]
+
 
 async def seed():
     """Seed the database with initial admin and test users if they do not exist."""
     await init_db()
+    # Validate first so the lookup compares the addresses as they are stored
+    # (EmailStr lowercases the domain)
+    seed_users = [UserCreate(**u) for u in SEED_USERS]
     async with AsyncSessionLocal() as db:
-        user_service = UserService(db)
-        # Create admin user
-        try:
-            await user_service.create_user(
-                UserCreate(
-                    email=ADMIN_EMAIL,
-                    password=ADMIN_PASSWORD,
-                    username="admin",
-                    first_name="Admin",
-                    last_name="User",
+        # One lookup for every seed user that is already present
+        result = await db.execute(
+            select(User.email, User.username).where(
+                or_(
+                    User.email.in_([u.email for u in seed_users]),
+                    User.username.in_([u.username for u in seed_users]),
                 )
             )
-            logger.info("Admin user created", email=ADMIN_EMAIL)
-        except Exception as e:
-            logger.info("Admin user exists or error", error=str(e))
-        # Create test user
+        )
+        taken = {value for row in result for value in row}
+        missing = []
+        for user in seed_users:
+            if user.email in taken or user.username in taken:
+                logger.info("Seed user exists", email=user.email)
+            else:
+                missing.append(user)
+        if not missing:
+            return
+
+        # Hashed concurrently and inserted with a single statement; a row
+        # created since the lookup rolls back the whole batch
         try:
-            await user_service.create_user(
-                UserCreate(
-                    email=TEST_EMAIL,
-                    password=TEST_PASSWORD,
-                    username="testuser",
-                    first_name="Test",
-                    last_name="User",
-                )
-            )
-            logger.info("Test user created", email=TEST_EMAIL)
-        except Exception as e:
-            logger.info("Test user exists or error", error=str(e))
+            await user_service.bulk_create_users(db, missing)
+        except ValueError as e:
+            logger.info("Seed user exists; nothing created", error=str(e))
+            return
+        for user in missing:
+            logger.info("Seed user created", email=user.email)
 
 
 if __name__ == "__main__":
@@ -2,16 +2,14 @@
 
 import asyncio
 import os
+from functools import lru_cache
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, insert, select, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-
-from app.core.database import Base, get_db
-from app.main import app
-from app.schemas.user import UserCreate
-from app.services.user_service import UserService
+from sqlalchemy.pool import StaticPool
 
 # Check if we're running integration tests
 is_integration_test = os.getenv("INTEGRATION_TEST", "false").lower() == "true"
@@ -25,23 +23,42 @@ if is_integration_test:
 else:
     database_url = "sqlite+aiosqlite:///:memory:"
 
-# Set testing environment
+# Set testing environment before the app reads its settings
 os.environ["TESTING"] = "true"
 os.environ["DATABASE_URL"] = database_url
 os.environ["SECRET_KEY"] = "test-secret-key"
 
-# Create test database engine
-test_engine = create_async_engine(
-    database_url,
-    echo=False,
-)
+from app.core.database import Base, get_db, get_session_factory  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.auth_service import auth_service  # noqa: E402
+from app.services.user_service import user_service  # noqa: E402
+
+
+@lru_cache(maxsize=None)
+def get_test_engine():
+    """Create the test database engine on first use.
+
+    Built lazily so collection (and each pytest-xdist worker) only creates
+    an engine once a test actually touches the database. The in-memory
+    SQLite database lives in a single connection every session must share.
+    """
+    return create_async_engine(
+        database_url,
+        echo=False,
+        **({} if is_integration_test else {"poolclass": StaticPool}),
+    )
+
 
-# Create test session factory
-TestingSessionLocal = sessionmaker(
-    test_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+@lru_cache(maxsize=None)
+def get_test_session_factory():
+    """Create the test session factory bound to the test engine."""
+    return sessionmaker(
+        get_test_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
 
 
 @pytest.fixture(scope="session")
@@ -52,44 +69,122 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture(autouse=True)
-async def setup_database():
-    """Set up test database with tables and create admin user."""
-    async with test_engine.begin() as conn:
+# Admin row reinserted before every test; hashed once since bcrypt
+# dominates the per-test setup cost
+ADMIN_USER = {
+    "email": "admin@vibestack.dev",
+    "hashed_password": get_password_hash("Admin1234!"),
+    "username": "admin",
+    "first_name": "Admin",
+    "last_name": "User",
+    "is_superuser": True,
+}
+
+# Regular user for tests that only need to be signed in
+PROFILE_USER = {
+    "email": "profileuser@vibestack.dev",
+    "hashed_password": get_password_hash("Profile1234!"),
+    "username": "profileuser",
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def database_schema():
+    """Create the test database tables once for the whole session."""
+    async with get_test_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Create admin user
-    async with TestingSessionLocal() as session:
-        user_service = UserService(session)
-        try:
-            await user_service.create_user(
-                UserCreate(
-                    email="admin@vibestack.dev",
-                    password="Admin1234!",
-                    username="admin",
-                    first_name="Admin",
-                    last_name="User",
-                    is_superuser=True,
-                )
-            )
-        except Exception:
-            pass
-
     yield
 
     if not is_integration_test:
         # Drop tables after unit tests
-        async with test_engine.begin() as conn:
+        async with get_test_engine().begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(autouse=True)
+async def setup_database(database_schema):
+    """Empty every table and re-seed the admin user before each test.
+
+    Both the unit and the integration run start every test from the admin
+    row alone, so a test must seed any other user it relies on (see
+    ``user_headers``) rather than expect rows left by an earlier test.
+    """
+    async with get_test_engine().begin() as conn:
+        if is_integration_test:
+            tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+            await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        else:
+            # SQLite has no TRUNCATE; rowids restart once the table is empty
+            for table in reversed(Base.metadata.sorted_tables):
+                await conn.execute(table.delete())
+        await conn.execute(insert(User).values(**ADMIN_USER))
+
+    yield
+
+    # User IDs are reused once tables are emptied
+    user_service.clear_profile_cache()
+
+
 @pytest.fixture
 async def db_session():
     """Create a test database session."""
-    async with TestingSessionLocal() as session:
+    async with get_test_session_factory()() as session:
         yield session
 
 
+async def _auth_headers(user: dict, insert_row: bool) -> dict:
+    """Return bearer headers for a seeded user, minting the token directly."""
+    async with get_test_engine().begin() as conn:
+        if insert_row:
+            await conn.execute(insert(User).values(**user))
+        user_id = (
+            await conn.execute(select(User.user_id).where(User.email == user["email"]))
+        ).scalar_one()
+    # The row bypassed the service, so drop any profile cached for a reused ID
+    user_service.invalidate_profile(user_id)
+    tokens = auth_service.create_tokens_for_user(
+        user_id=user_id,
+        email=user["email"],
+        username=user["username"],
+        is_superuser=user.get("is_superuser", False),
+    )
+    return {"Authorization": f"Bearer {tokens.access_token}"}
+
+
+@pytest.fixture
+async def admin_headers():
+    """Provide bearer headers for the seeded admin without a login request."""
+    return await _auth_headers(ADMIN_USER, insert_row=False)
+
+
+@pytest.fixture
+async def user_headers():
+    """Provide bearer headers for a freshly seeded regular user.
+
+    The row uses a password hashed once at import and the token is issued
+    directly, so no register or login round trip (or bcrypt) runs per test.
+    """
+    return await _auth_headers(PROFILE_USER, insert_row=True)
+
+
+@pytest.fixture
+def count_queries():
+    """Record SQL statements executed on the test engine during a test.
+
+    Clear the returned list before the calls being measured and compare its
+    length against the expected query budget.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(get_test_engine().sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(get_test_engine().sync_engine, "before_cursor_execute", record)
+
+
 @pytest.fixture
 async def async_client(db_session):
     """Provide an async HTTP client for testing."""
@@ -98,6 +193,7 @@ async def async_client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = get_test_session_factory
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -6,9 +6,10 @@ from httpx import AsyncClient
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_register_and_login(async_client: AsyncClient):
+async def test_register_and_login(async_client: AsyncClient, count_queries):
     """Test user registration, login, and token refresh flow."""
-    # Register a new user
+    # Register a new user: INSERT ... RETURNING plus the refresh SELECT
+    count_queries.clear()
     response = await async_client.post(
         "/api/v1/auth/register",
         json={
@@ -20,8 +21,10 @@ async def test_register_and_login(async_client: AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == "pytestuser@vibestack.dev"
+    assert len(count_queries) <= 2
 
-    # Login with the new user
+    # Login with the new user: credentials SELECT plus last-login UPDATE
+    count_queries.clear()
     response = await async_client.post(
         "/api/v1/auth/login",
         json={"email": "pytestuser@vibestack.dev", "password": "Pytest1234!"},
@@ -30,8 +33,17 @@ async def test_register_and_login(async_client: AsyncClient):
     tokens = response.json()
     assert "access_token" in tokens
     assert "refresh_token" in tokens
+    assert len(count_queries) <= 2
 
-    # Refresh token
+    # The last login time is recorded once the response has been sent
+    response = await async_client.get(
+        "/api/v1/users/me",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.json()["last_login_at"] is not None
+
+    # Refresh token: at most one profile SELECT
+    count_queries.clear()
     response = await async_client.post(
         "/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
     )
@@ -39,3 +51,73 @@ async def test_register_and_login(async_client: AsyncClient):
     refreshed = response.json()
     assert "access_token" in refreshed
     assert "refresh_token" in refreshed
+    assert len(count_queries) <= 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_login_rejects_unknown_fields(async_client: AsyncClient):
+    """Test auth request schemas forbid unexpected fields."""
+    response = await async_client.post(
+        "/api/v1/auth/login",
+        json={
+            "email": "admin@vibestack.dev",
+            "password": "Admin1234!",
+            "remember_me": True,
+        },
+    )
+    assert response.status_code == 422
+
+    response = await async_client.post(
+        "/api/v1/auth/login", json={"email": "admin@vibestack.dev", "password": ""}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_login_normalizes_email_like_registration(async_client: AsyncClient):
+    """Test login accepts the address as typed at registration."""
+    response = await async_client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "Foo@Vibestack.DEV",
+            "password": "Mixed1234!",
+            "username": "mixedcase",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["email"] == "Foo@vibestack.dev"
+
+    for email in ("Foo@Vibestack.DEV", " Foo@vibestack.dev "):
+        response = await async_client.post(
+            "/api/v1/auth/login", json={"email": email, "password": "Mixed1234!"}
+        )
+        assert response.status_code == 200, email
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_register_rejects_taken_email_and_username(async_client: AsyncClient):
+    """Test registration reports which unique field is already taken."""
+    response = await async_client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "admin@vibestack.dev",
+            "password": "Another1234!",
+            "username": "someoneelse",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+    response = await async_client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "someoneelse@vibestack.dev",
+            "password": "Another1234!",
+            "username": "admin",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already taken"
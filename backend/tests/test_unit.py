@@ -1,10 +1,35 @@
 """Unit tests for VibeStack backend services."""
 
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import jwt
 import pytest
-from passlib.context import CryptContext
+from fastapi import Depends, FastAPI
+from passlib.hash import bcrypt
+from sqlalchemy.exc import DisconnectionError, IntegrityError
 
-from app.core.security import create_access_token, verify_password
-from app.schemas.user import UserCreate
+from app.api.v1.endpoints.users import get_current_user
+from app.core import database, security
+from app.core.config import Settings, settings
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    get_token_expiration,
+    invalidate_token,
+    verify_password,
+    verify_password_async,
+    verify_token,
+)
+from app.main import install_bearer_openapi
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.auth_service import auth_service
+from app.services.user_service import user_service
 
 
 @pytest.mark.asyncio
@@ -21,12 +46,41 @@ async def test_password_verification():
         is False
     )
 
-    # Test with correct hash
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-    hashed = pwd_context.hash(password)
+    # Test with correct hash from the shared module-level context
+    hashed = security.pwd_context.hash(password)
     assert verify_password(password, hashed) is True
 
 
+@pytest.mark.asyncio
+@pytest.mark.slow
+@pytest.mark.skipif(
+    "BCRYPT_TARGET_MS" not in os.environ,
+    reason="set BCRYPT_TARGET_MS to check bcrypt cost on target hardware",
+)
+async def test_bcrypt_cost_is_calibrated():
+    """Test password verification meets the configured latency budget."""
+    # Tests run at the minimum cost; check the deployment's configured one
+    rounds = Settings().BCRYPT_ROUNDS
+    hashed = bcrypt.using(rounds=rounds).hash("TestPassword123!")
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        bcrypt.verify("TestPassword123!", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    assert statistics.median(timings) >= float(os.environ["BCRYPT_TARGET_MS"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_password_hashing_off_event_loop():
+    """Test the threaded password helpers round-trip."""
+    hashed = await get_password_hash_async("TestPassword123!")
+    assert hashed.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert await verify_password_async("TestPassword123!", hashed) is True
+    assert await verify_password_async("WrongPassword123!", hashed) is False
+
+
 @pytest.mark.asyncio
 @pytest.mark.unit
 async def test_token_creation():
@@ -39,6 +93,36 @@ async def test_token_creation():
     assert isinstance(token, str)
     assert len(token) > 0
 
+    # exp is an integer epoch, exposed as an aware UTC datetime
+    expires_at = get_token_expiration(token)
+    expected = datetime.now(timezone.utc) + timedelta(
+        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+    assert expires_at.tzinfo is timezone.utc
+    assert abs((expires_at - expected).total_seconds()) < 5
+    expired = create_access_token(
+        data={"sub": "1"}, expires_delta=timedelta(seconds=-1)
+    )
+    assert verify_token(expired) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_token_verification_cache():
+    """Test verified token payloads are cached and can be invalidated."""
+    token = create_access_token(data={"sub": "42"})
+
+    payload = verify_token(token)
+    assert payload["sub"] == "42"
+    assert verify_token(token) is payload
+    assert verify_token(token, token_type="refresh") is None
+
+    invalidate_token(token)
+    assert verify_token(token) is not payload
+    assert verify_token("not-a-token") is None
+    assert verify_token("a.b.c.d") is None
+    assert verify_token(token + "x" * 4096) is None
+
 
 @pytest.mark.asyncio
 @pytest.mark.unit
@@ -64,3 +148,256 @@ async def test_user_schema_validation():
             password="TestPassword123!",
             username="testuser",
         )
+
+    for username, message in (
+        ("ab", "at least 3"),
+        ("a" * 51, "at most 50"),
+        ("bad name", "can only contain"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            UserCreate(
+                email="test@example.com",
+                password="TestPassword123!",
+                username=username,
+            )
+
+    for password, message in (
+        ("Short1!", "at least 8"),
+        ("lowercase123", "uppercase"),
+        ("UPPERCASE123", "lowercase"),
+        ("NoDigitsHere", "digit"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            UserCreate(email="test@example.com", password=password)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_user_name_properties_are_invalidated():
+    """Test memoized User name properties follow column assignments."""
+    user = User(email="test@example.com", first_name="Test")
+    assert user.full_name == "Test"
+    assert user.display_name == "test@example.com"
+
+    user.last_name = "User"
+    user.username = "testuser"
+    assert user.full_name == "Test User"
+    assert user.display_name == "testuser"
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_user_role_permissions():
+    """Test role-based permission lookups on the User model."""
+    user = User(email="test@example.com", role="user", is_active=True)
+    assert user.has_permission("read") is True
+    assert user.has_permission("delete") is False
+
+    admin = User(email="admin@example.com", role="admin", is_active=True)
+    assert admin.has_permission("delete") is True
+
+    inactive = User(email="gone@example.com", role="admin", is_active=False)
+    assert inactive.has_permission("read") is False
+    assert User(email="root@example.com", is_superuser=True).has_permission("any")
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_token_encoding_matches_pyjwt():
+    """Test the direct HS256 encoder emits the same token as PyJWT."""
+    claims = {"sub": "1", "email": "test@example.com", "exp": 2_000_000_000}
+    expected = jwt.encode(claims, settings.SECRET_KEY, algorithm="HS256")
+    assert security._encode_jwt(claims) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_fast_token_validity_check():
+    """Test the database-free token validity check."""
+    tokens = auth_service.create_tokens_for_user(user_id=1, email="test@example.com")
+    assert auth_service.is_token_valid_fast(tokens.access_token) is True
+    assert auth_service.is_token_valid_fast(tokens.refresh_token) is False
+    assert auth_service.is_token_valid_fast("not-a-token") is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_bulk_create_users(db_session):
+    """Test seeding several users with one INSERT."""
+    users = [
+        UserCreate(
+            email=f"bulk{i}@vibestack.dev", password="Bulk1234!", username=f"bulk{i}"
+        )
+        for i in range(3)
+    ]
+    assert await user_service.bulk_create_users(db_session, users) == 3
+
+    user = await user_service.authenticate_user(
+        db_session, "bulk1@vibestack.dev", "Bulk1234!"
+    )
+    assert user is not None
+    assert user.is_active and not user.is_superuser
+
+    duplicate = users[0].model_copy(update={"username": "bulkother"})
+    with pytest.raises(ValueError, match="Email already registered"):
+        await user_service.bulk_create_users(db_session, [duplicate])
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_unknown_email_still_checks_a_password(db_session, monkeypatch):
+    """Test that a login for an unknown email spends a bcrypt check."""
+    checked = []
+    real_verify = security.verify_password
+
+    def counting_verify(plain_password, hashed_password):
+        checked.append(plain_password)
+        return real_verify(plain_password, hashed_password)
+
+    monkeypatch.setattr(security, "verify_password", counting_verify)
+
+    user = await user_service.authenticate_user(
+        db_session, "nobody@vibestack.dev", "Nobody1234!"
+    )
+    assert user is None
+    assert checked == ["Nobody1234!"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_concurrent_profile_misses_share_one_query(db_session, count_queries):
+    """Test that simultaneous cache misses for one user load it once."""
+    admin = await user_service.get_user_by_email(db_session, "admin@vibestack.dev")
+    db_session.expunge_all()
+
+    count_queries.clear()
+    profiles = await asyncio.gather(
+        *(user_service.get_user_profile(db_session, admin.user_id) for _ in range(5))
+    )
+    assert len(count_queries) == 1
+    assert {p.email for p in profiles} == {"admin@vibestack.dev"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_integrity_errors_map_by_constraint_name():
+    """Test only known unique constraints become user-facing conflicts."""
+
+    class FakeUniqueViolationError(Exception):
+        constraint_name = "ix_users_email"
+
+    # The Postgres message carries the duplicate value; only the name counts
+    exc = IntegrityError(
+        "UPDATE users", {}, FakeUniqueViolationError("Key (email)=(username@x.com)")
+    )
+    assert str(user_service._conflict_error(exc)) == "Email already registered"
+
+    exc = IntegrityError(
+        "UPDATE users", {}, Exception("UNIQUE constraint failed: users.username")
+    )
+    assert str(user_service._conflict_error(exc)) == "Username already taken"
+
+    exc = IntegrityError(
+        "UPDATE users", {}, Exception("NOT NULL constraint failed: users.email")
+    )
+    assert user_service._conflict_error(exc) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_user_update_rejects_null_for_required_columns():
+    """Test explicit nulls are refused for non-nullable columns."""
+    for field in ("email", "is_active", "is_verified"):
+        with pytest.raises(ValueError, match=f"{field} cannot be null"):
+            UserUpdate(**{field: None})
+
+    # Omitted fields and nullable columns are still fine
+    assert UserUpdate().model_fields_set == set()
+    assert UserUpdate(username=None).username is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_login_rehashes_passwords_at_other_costs(db_session):
+    """Test a hash stored at another bcrypt cost is replaced on login."""
+    await user_service.create_user(
+        db_session,
+        UserCreate(email="oldcost@vibestack.dev", password="Oldcost1234!"),
+    )
+    old_hash = bcrypt.using(rounds=settings.BCRYPT_ROUNDS + 1).hash("Oldcost1234!")
+    user = await user_service.get_user_by_email(db_session, "oldcost@vibestack.dev")
+    user.hashed_password = old_hash
+    await db_session.commit()
+
+    assert await user_service.authenticate_user(
+        db_session, "oldcost@vibestack.dev", "Oldcost1234!"
+    )
+    await db_session.refresh(user)
+    assert user.hashed_password != old_hash
+    assert f"${settings.BCRYPT_ROUNDS:02d}$" in user.hashed_password
+    assert not security.pwd_context.needs_update(user.hashed_password)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_idle_connections_are_pinged_on_checkout(monkeypatch):
+    """Test the checkout ping runs only for idle connections."""
+    pings = []
+    monkeypatch.setattr(database.engine.dialect, "do_ping", pings.append)
+    interval = settings.DB_POOL_PING_INTERVAL
+
+    # Recently returned connections are handed out without a ping
+    record = SimpleNamespace(info={})
+    database._record_checkin("recent", record)
+    database._ping_idle_connection("recent", record, None)
+    assert pings == []
+
+    # Connections idle past the interval are pinged
+    record.info["checked_in_at"] = time.monotonic() - interval - 1
+    database._ping_idle_connection("idle", record, None)
+    assert pings == ["idle"]
+
+    # A failed ping makes the pool discard the connection
+    def failing_ping(dbapi_connection):
+        raise OSError("connection reset")
+
+    monkeypatch.setattr(database.engine.dialect, "do_ping", failing_ping)
+    with pytest.raises(DisconnectionError):
+        database._ping_idle_connection("stale", record, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_bearer_openapi_skips_hidden_routes():
+    """Test routes excluded from the schema don't break bearer docs."""
+    app = FastAPI()
+
+    @app.get("/visible")
+    async def visible(user=Depends(get_current_user)):  # noqa: B008
+        return user
+
+    @app.get("/hidden", include_in_schema=False)
+    async def hidden(user=Depends(get_current_user)):  # noqa: B008
+        return user
+
+    install_bearer_openapi(app)
+    paths = app.openapi()["paths"]
+    assert "/hidden" not in paths
+    assert paths["/visible"]["get"]["security"] == [{"OAuth2PasswordBearer": []}]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_user_to_dict_skips_validation():
+    """Test to_dict works on transient users and passes timestamps through."""
+    data = User(
+        email="new@vibestack.dev", first_name="New", username="u" * 80
+    ).to_dict()
+    assert data["user_id"] is None
+    assert data["created_at"] is None
+    assert data["username"] == "u" * 80
+    assert data["full_name"] == "New"
+
+    created = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    data = User(email="old@vibestack.dev", created_at=created).to_dict()
+    assert data["created_at"] is created
@@ -6,61 +6,142 @@ from httpx import AsyncClient
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_user_profile_and_update(async_client: AsyncClient):
+async def test_user_profile_and_update(async_client: AsyncClient, user_headers):
     """Test user profile retrieval and update functionality."""
-    # Register and login
-    await async_client.post(
-        "/api/v1/auth/register",
-        json={
-            "email": "profileuser@vibestack.dev",
-            "password": "Profile1234!",
-            "username": "profileuser",
-        },
-    )
-    login = await async_client.post(
-        "/api/v1/auth/login",
-        json={"email": "profileuser@vibestack.dev", "password": "Profile1234!"},
-    )
-    tokens = login.json()
-    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
-
     # Get profile
-    resp = await async_client.get("/api/v1/users/me", headers=headers)
+    resp = await async_client.get("/api/v1/users/me", headers=user_headers)
     assert resp.status_code == 200
     data = resp.json()
     assert data["email"] == "profileuser@vibestack.dev"
 
     # Update profile
     resp = await async_client.patch(
-        "/api/v1/users/me", json={"first_name": "Profile"}, headers=headers
+        "/api/v1/users/me", json={"first_name": "Profile"}, headers=user_headers
     )
     assert resp.status_code == 200
     data = resp.json()
     assert data["first_name"] == "Profile"
 
+    # Taken usernames are rejected
+    resp = await async_client.patch(
+        "/api/v1/users/me", json={"username": "admin"}, headers=user_headers
+    )
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Username already taken"
+
+    # Required columns cannot be cleared
+    resp = await async_client.patch(
+        "/api/v1/users/me", json={"email": None}, headers=user_headers
+    )
+    assert resp.status_code == 422
+
+    # Cached profile is refreshed after the update
+    resp = await async_client.get("/api/v1/users/me", headers=user_headers)
+    assert resp.status_code == 200
+    assert resp.json()["first_name"] == "Profile"
+
 
 @pytest.mark.asyncio
 @pytest.mark.integration
-async def test_admin_list_and_delete(async_client: AsyncClient):
+async def test_admin_list_and_delete(
+    async_client: AsyncClient, admin_headers, user_headers, count_queries
+):
     """Test admin user listing and deletion functionality."""
-    # Login as admin
-    login = await async_client.post(
-        "/api/v1/auth/login",
-        json={"email": "admin@vibestack.dev", "password": "Admin1234!"},
-    )
-    tokens = login.json()
-    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    # Admin rights come from the cached profile; load it once up front
+    resp = await async_client.get("/api/v1/users/me", headers=admin_headers)
+    assert resp.json()["is_superuser"] is True
 
-    # List users
-    resp = await async_client.get("/api/v1/users/", headers=headers)
+    # List users in a single query, whatever the page size
+    count_queries.clear()
+    resp = await async_client.get("/api/v1/users/", headers=admin_headers)
     assert resp.status_code == 200
-    users = resp.json()
+    assert len(count_queries) == 1
+    page = resp.json()
+    users = page["items"]
     assert isinstance(users, list)
+    assert page["next_cursor"] is None
+
+    # Page through users with a keyset cursor
+    resp = await async_client.get("/api/v1/users/?limit=1", headers=admin_headers)
+    assert resp.status_code == 200
+    page = resp.json()
+    assert len(page["items"]) == 1
+    assert page["next_cursor"] == page["items"][0]["user_id"]
+
+    # Offset pagination was removed and is rejected, not silently ignored
+    resp = await async_client.get("/api/v1/users/?skip=1", headers=admin_headers)
+    assert resp.status_code == 422
+    assert "cursor" in resp.json()["detail"]
+
+    # Following the cursor past the last user ends the listing
+    resp = await async_client.get(
+        f"/api/v1/users/?limit={len(users)}&cursor={users[-1]['user_id']}",
+        headers=admin_headers,
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"items": [], "next_cursor": None}
+
+    # Delete the seeded user within a budget of two queries
+    profile_user = next(u for u in users if u["email"] == "profileuser@vibestack.dev")
+    count_queries.clear()
+    resp = await async_client.delete(
+        f"/api/v1/users/{profile_user['user_id']}", headers=admin_headers
+    )
+    assert resp.status_code == 200
+    assert len(count_queries) <= 2
+
+    # The deleted user's token no longer authenticates
+    resp = await async_client.get("/api/v1/users/me", headers=user_headers)
+    assert resp.status_code == 401
+
+    # A deactivated admin loses admin rights before the token expires
+    admin_id = (
+        await async_client.get("/api/v1/users/me", headers=admin_headers)
+    ).json()["user_id"]
+    resp = await async_client.delete(f"/api/v1/users/{admin_id}", headers=admin_headers)
+    assert resp.status_code == 200
+    resp = await async_client.get("/api/v1/users/", headers=admin_headers)
+    assert resp.status_code == 401
+    resp = await async_client.delete(
+        f"/api/v1/users/{profile_user['user_id']}", headers=admin_headers
+    )
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_bearer_auth_required_and_documented(async_client: AsyncClient):
+    """Test protected routes reject missing tokens and document bearer auth."""
+    resp = await async_client.get("/api/v1/users/me")
+    assert resp.status_code == 401
+    assert resp.headers["www-authenticate"] == "Bearer"
+
+    resp = await async_client.get(
+        "/api/v1/users/me", headers={"Authorization": "Basic abc"}
+    )
+    assert resp.status_code == 401
+
+    schema = (await async_client.get("/openapi.json")).json()
+    assert "OAuth2PasswordBearer" in schema["components"]["securitySchemes"]
+    assert schema["paths"]["/api/v1/users/me"]["get"]["security"] == [
+        {"OAuth2PasswordBearer": []}
+    ]
+    assert "security" not in schema["paths"]["/api/v1/auth/login"]["post"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_admin_routes_require_superuser(async_client: AsyncClient, user_headers):
+    """Test admin routes require a superuser account."""
+    resp = await async_client.get("/api/v1/users/", headers=user_headers)
+    assert resp.status_code == 403
+
+    resp = await async_client.get(
+        "/api/v1/users/", headers={"Authorization": "Bearer not-a-token"}
+    )
+    assert resp.status_code == 401
 
-    # Delete test user (if exists)
-    for user in users:
-        if user["email"] == "pytestuser@vibestack.dev":
-            resp = await async_client.delete(
-                f"/api/v1/users/{user['id']}", headers=headers
-            )
-            assert resp.status_code == 200
+    schema = (await async_client.get("/openapi.json")).json()
+    assert schema["paths"]["/api/v1/users/"]["get"]["security"] == [
+        {"OAuth2PasswordBearer": []}
+    ]